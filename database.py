@@ -1,14 +1,66 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from uuid import uuid4
 import os
 from dotenv import load_dotenv
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
+# Same database through its asyncio driver (asyncpg for Postgres, aiosqlite for the local SQLite fallback)
+_url = make_url(DATABASE_URL)
+ASYNC_DATABASE_URL = _url.set(
+    drivername="sqlite+aiosqlite" if _url.get_backend_name() == "sqlite" else "postgresql+asyncpg"
+)
+
+# Pool settings, overridable per deployment
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "40"))
+# The async engine serves only the async routes, so it gets a smaller overflow of its own
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# True when DATABASE_URL points at PgBouncer in transaction pooling mode
+USE_PGBOUNCER = os.getenv("USE_PGBOUNCER", "false").lower() in ("1", "true", "yes")
+
+if "sqlite" in DATABASE_URL:
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(ASYNC_DATABASE_URL)
+else:
+    # Pool sized for FastAPI's threadpool; pre_ping/recycle drop connections killed by a DB restart or idle timeout
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    if USE_PGBOUNCER:
+        # PgBouncer already pools server connections; asyncpg's prepared statements
+        # do not survive transaction pooling, so disable its statement caches
+        async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            poolclass=NullPool,
+            connect_args={
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            },
+        )
+    else:
+        async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_ASYNC_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: async code cannot lazy-load attributes expired by a commit
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 def get_db():
@@ -17,3 +69,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -84,16 +84,28 @@ try:
         conn.execute(text("CREATE INDEX IF NOT EXISTS ix_trip_invitations_invited_user_id ON trip_invitations(invited_user_id);"))
         conn.execute(text("CREATE INDEX IF NOT EXISTS ix_trip_invitations_invited_by_id ON trip_invitations(invited_by_id);"))
         conn.execute(text("CREATE INDEX IF NOT EXISTS ix_trip_invitations_status ON trip_invitations(status);"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_trip_invitations_user_status ON trip_invitations(invited_user_id, status);"))
+        
+        # Follows: reverse-direction composite index (uq_follow already covers follower_id, following_id)
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_follows_following_follower ON follows(following_id, follower_id);"))
 except Exception:
     import sys, traceback
     traceback.print_exc()
     print("Warning: automatic location field migrations failed; you may need to run DB migrations manually.", file=sys.stderr)
 
-app = FastAPI(title="Travel API (Users, Trips, POIs, Itinerary, Chat, Estimates)")
+from contextlib import asynccontextmanager
+from utils.geocoding_helpers import close_http_client
+from utils.logger import api_log as api_logger
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Close pooled connections held by the shared geocoding client
+    await close_http_client()
+
 
-# setup file logger for API failures
-from logger_utils import setup_api_logger
-api_logger = setup_api_logger()
+app = FastAPI(title="Travel API (Users, Trips, POIs, Itinerary, Chat, Estimates)", lifespan=lifespan)
 
 
 @app.exception_handler(Exception)
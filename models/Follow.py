@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, Index, func
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -6,6 +6,8 @@ class Follow(Base):
     __tablename__ = "follows"
     __table_args__ = (
         UniqueConstraint("follower_id", "following_id", name="uq_follow"),
+        # Reverse direction of uq_follow (is_followed_by lookups, followers lists)
+        Index("ix_follows_following_follower", "following_id", "follower_id"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, func, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, func, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 from database import Base
 import enum
 
@@ -8,17 +9,32 @@ class InvitationStatus(enum.Enum):
     ACCEPTED = "accepted"
     REJECTED = "rejected"
 
+class StatusStr(TypeDecorator):
+    """Keeps the InvitationStatus enum column but always loads the status as its plain string value."""
+    impl = SQLEnum(InvitationStatus)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, str):
+            return InvitationStatus(value)
+        return value
+
+    def process_result_value(self, value, dialect):
+        return value.value if isinstance(value, InvitationStatus) else value
+
 class TripInvitation(Base):
     __tablename__ = "trip_invitations"
     __table_args__ = (
         UniqueConstraint("trip_id", "invited_user_id", name="uq_trip_invitation"),
+        # list_user_invitations: WHERE invited_user_id = ? [AND status = ?]
+        Index("ix_trip_invitations_user_status", "invited_user_id", "status"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
     trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), nullable=False, index=True)
     invited_user_id = Column(String, ForeignKey("users.firebase_uid", ondelete="CASCADE"), nullable=False, index=True)
     invited_by_id = Column(String, ForeignKey("users.firebase_uid", ondelete="CASCADE"), nullable=False, index=True)
-    status = Column(SQLEnum(InvitationStatus), default=InvitationStatus.PENDING, nullable=False, index=True)
+    status = Column(StatusStr(), default=InvitationStatus.PENDING, nullable=False, index=True)
     message = Column(String(500), nullable=True)  # Mensaje opcional de invitación
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     responded_at = Column(DateTime(timezone=True), nullable=True)
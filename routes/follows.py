@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import List
 
 from database import get_db
@@ -22,37 +24,41 @@ def follow_user(
     if follower_id == following_id:
         raise HTTPException(status_code=400, detail="Cannot follow yourself")
     
-    # Verify both users exist
-    follower = db.query(User).filter(User.firebase_uid == follower_id).first()
-    following = db.query(User).filter(User.firebase_uid == following_id).first()
+    # Verify both users exist (one column-only query)
+    existing_users = set(db.scalars(
+        select(User.firebase_uid).where(User.firebase_uid.in_([follower_id, following_id]))
+    ))
     
-    if not follower:
+    if follower_id not in existing_users:
         raise HTTPException(status_code=404, detail="Follower user not found")
-    if not following:
+    if following_id not in existing_users:
         raise HTTPException(status_code=404, detail="Following user not found")
     
-    # Check if already following
-    existing_follow = db.query(Follow).filter(
-        Follow.follower_id == follower_id,
-        Follow.following_id == following_id
-    ).first()
+    # Create follow relationship; uq_follow rejects duplicates atomically
+    new_follow = db.scalar(
+        pg_insert(Follow)
+        .values(follower_id=follower_id, following_id=following_id)
+        .on_conflict_do_nothing(constraint="uq_follow")
+        .returning(Follow)
+    )
     
-    if existing_follow:
+    if new_follow is None:
         raise HTTPException(status_code=409, detail="Already following this user")
     
-    # Create follow relationship
-    new_follow = Follow(
-        follower_id=follower_id,
-        following_id=following_id
+    # Update counters in SQL so concurrent follows never lose an increment
+    db.execute(
+        update(User)
+        .where(User.firebase_uid == follower_id)
+        .values(following_count=User.following_count + 1)
+    )
+    db.execute(
+        update(User)
+        .where(User.firebase_uid == following_id)
+        .values(followers_count=User.followers_count + 1)
     )
-    db.add(new_follow)
-    
-    # Update counters
-    follower.following_count += 1
-    following.followers_count += 1
     
+    db.expunge(new_follow)
     db.commit()
-    db.refresh(new_follow)
     return new_follow
 
 
@@ -65,23 +71,30 @@ def unfollow_user(
     """
     Unfollow a user.
     """
-    follow = db.query(Follow).filter(
-        Follow.follower_id == follower_id,
-        Follow.following_id == following_id
-    ).first()
+    deleted_id = db.scalar(
+        delete(Follow)
+        .where(
+            Follow.follower_id == follower_id,
+            Follow.following_id == following_id
+        )
+        .returning(Follow.id)
+    )
     
-    if not follow:
+    if deleted_id is None:
         raise HTTPException(status_code=404, detail="Follow relationship not found")
     
-    # Get users to update counters
-    follower = db.query(User).filter(User.firebase_uid == follower_id).first()
-    following = db.query(User).filter(User.firebase_uid == following_id).first()
-    
-    if follower and following:
-        follower.following_count = max(0, follower.following_count - 1)
-        following.followers_count = max(0, following.followers_count - 1)
+    # Decrement counters in SQL (never below zero)
+    db.execute(
+        update(User)
+        .where(User.firebase_uid == follower_id)
+        .values(following_count=func.greatest(User.following_count - 1, 0))
+    )
+    db.execute(
+        update(User)
+        .where(User.firebase_uid == following_id)
+        .values(followers_count=func.greatest(User.followers_count - 1, 0))
+    )
     
-    db.delete(follow)
     db.commit()
     return {"message": "Unfollowed successfully"}
 
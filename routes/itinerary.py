@@ -1,13 +1,14 @@
 from typing import List
 from datetime import datetime, date, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 
 from models.Trip import Trip
 from models.POI import POI
 from models.ItineraryItem import ItineraryItem
-from schemas import ItineraryItemWrite, ItineraryItemRead, TripSchedule, ScheduleDay, ScheduleActivity, FreeTimeSlot, POIRead
+from schemas import ItineraryItemWrite, ItineraryItemRead, TripSchedule
 from database import get_db
 
 router = APIRouter(prefix="/trips/{trip_id}/itinerary", tags=["Itinerary"])
@@ -185,7 +186,8 @@ def get_schedule(trip_id: int, db: Session = Depends(get_db)):
         or_(ItineraryItem.start_ts.is_(None), ItineraryItem.start_ts == None)
     ).all()
     
-    # Combine scheduled activities
+    # Activities are assembled as plain dicts; Pydantic validates the whole
+    # schedule once at the end instead of building a model per activity/slot
     activities = []
     
     # Add POIs as activities
@@ -194,21 +196,20 @@ def get_schedule(trip_id: int, db: Session = Depends(get_db)):
         if poi.scheduled_at and poi.duration_minutes:
             end_time = poi.scheduled_at + timedelta(minutes=poi.duration_minutes)
         
-        activity = ScheduleActivity(
-            id=f"poi_{poi.id}",
-            type="poi",
-            name=poi.name,
-            start_time=poi.scheduled_at,
-            end_time=end_time,
-            duration_minutes=poi.duration_minutes,
-            poi_id=poi.id,
-            address=poi.address,
-            city=poi.city,
-            country=poi.country,
-            estimated_cost=poi.estimated_cost,
-            description=poi.notes,
-        )
-        activities.append(activity)
+        activities.append({
+            "id": f"poi_{poi.id}",
+            "type": "poi",
+            "name": poi.name,
+            "start_time": poi.scheduled_at,
+            "end_time": end_time,
+            "duration_minutes": poi.duration_minutes,
+            "poi_id": poi.id,
+            "address": poi.address,
+            "city": poi.city,
+            "country": poi.country,
+            "estimated_cost": poi.estimated_cost,
+            "description": poi.notes,
+        })
     
     # Add ItineraryItems as activities
     for item in scheduled_items:
@@ -218,100 +219,68 @@ def get_schedule(trip_id: int, db: Session = Depends(get_db)):
         elif not name:
             name = "Actividad sin nombre"
         
-        activity = ScheduleActivity(
-            id=f"item_{item.id}",
-            type="itinerary_item",
-            name=name,
-            start_time=item.start_ts,
-            end_time=item.end_ts,
-            duration_minutes=int((item.end_ts - item.start_ts).total_seconds() / 60) if item.end_ts and item.start_ts else None,
-            itinerary_item_id=item.id,
-            poi_id=item.poi_id,
-            address=item.poi.address if item.poi else None,
-            city=item.poi.city if item.poi else None,
-            country=item.poi.country if item.poi else None,
-            description=item.poi.notes if item.poi else None,
-        )
-        activities.append(activity)
+        activities.append({
+            "id": f"item_{item.id}",
+            "type": "itinerary_item",
+            "name": name,
+            "start_time": item.start_ts,
+            "end_time": item.end_ts,
+            "duration_minutes": int((item.end_ts - item.start_ts).total_seconds() / 60) if item.end_ts and item.start_ts else None,
+            "itinerary_item_id": item.id,
+            "poi_id": item.poi_id,
+            "address": item.poi.address if item.poi else None,
+            "city": item.poi.city if item.poi else None,
+            "country": item.poi.country if item.poi else None,
+            "description": item.poi.notes if item.poi else None,
+        })
     
     # Sort activities by start_time
-    activities.sort(key=lambda a: a.start_time or datetime.min)
+    activities.sort(key=lambda a: a["start_time"] or datetime.min)
     
     # Group by day
     days_dict = {}
     for activity in activities:
-        if not activity.start_time:
+        if not activity["start_time"]:
             continue
         
-        day_key = activity.start_time.date()
+        day_key = activity["start_time"].date()
         if day_key not in days_dict:
-            days_dict[day_key] = ScheduleDay(date=day_key, activities=[], free_time_slots=[])
-        days_dict[day_key].activities.append(activity)
+            days_dict[day_key] = {"date": day_key, "activities": [], "free_time_slots": []}
+        days_dict[day_key]["activities"].append(activity)
     
     # Detect free time slots for each day
     for day_key, day_schedule in days_dict.items():
         # Sort activities by start_time for this day
-        day_schedule.activities.sort(key=lambda a: a.start_time or datetime.min)
+        day_activities = day_schedule["activities"]
+        day_activities.sort(key=lambda a: a["start_time"] or datetime.min)
         
         # Detect gaps between activities
-        for i in range(len(day_schedule.activities) - 1):
-            current = day_schedule.activities[i]
-            next_activity = day_schedule.activities[i + 1]
-            
-            if not current.end_time or not next_activity.start_time:
+        for current, next_activity in zip(day_activities, day_activities[1:]):
+            if not current["end_time"] or not next_activity["start_time"]:
                 continue
             
             # If there's a gap of at least 15 minutes, it's free time
-            gap_minutes = (next_activity.start_time - current.end_time).total_seconds() / 60
+            gap_minutes = (next_activity["start_time"] - current["end_time"]).total_seconds() / 60
             if gap_minutes >= 15:
-                free_time = FreeTimeSlot(
-                    start_time=current.end_time,
-                    end_time=next_activity.start_time,
-                    duration_minutes=int(gap_minutes),
-                )
-                day_schedule.free_time_slots.append(free_time)
+                day_schedule["free_time_slots"].append({
+                    "start_time": current["end_time"],
+                    "end_time": next_activity["start_time"],
+                    "duration_minutes": int(gap_minutes),
+                })
     
     # Convert to list and sort by date
-    days_list = sorted(days_dict.values(), key=lambda d: d.date)
-    
-    # Create response (convert ORM to Pydantic models)
-    unscheduled_pois_read = []
-    for poi in unscheduled_pois:
-        poi_dict = {
-            'id': poi.id,
-            'trip_id': poi.trip_id,
-            'name': poi.name,
-            'notes': poi.notes,
-            'lat': poi.lat,
-            'lng': poi.lng,
-            'address': poi.address,
-            'city': poi.city,
-            'country': poi.country,
-            'place_name': poi.place_name,
-            'scheduled_at': poi.scheduled_at,
-            'duration_minutes': poi.duration_minutes,
-            'estimated_cost': poi.estimated_cost,
-        }
-        unscheduled_pois_read.append(POIRead(**poi_dict))
-    
-    unscheduled_items_read = []
-    for item in unscheduled_items:
-        item_dict = {
-            'id': item.id,
-            'trip_id': item.trip_id,
-            'poi_id': item.poi_id,
-            'name': item.name,
-            'start_ts': item.start_ts,
-            'end_ts': item.end_ts,
-            'status': item.status,
-        }
-        unscheduled_items_read.append(ItineraryItemRead(**item_dict))
+    days_list = sorted(days_dict.values(), key=lambda d: d["date"])
     
-    schedule = TripSchedule(
-        trip_id=trip_id,
-        days=days_list,
-        unscheduled_pois=unscheduled_pois_read,
-        unscheduled_items=unscheduled_items_read,
+    # Single validation pass (dicts + ORM rows) and JSON encoding in Pydantic's Rust core;
+    # returning a Response skips FastAPI's second response_model validation
+    schedule = TripSchedule.model_validate(
+        {
+            "trip_id": trip_id,
+            "days": days_list,
+            "unscheduled_pois": unscheduled_pois,
+            "unscheduled_items": unscheduled_items,
+        },
+        from_attributes=True,
     )
     
-    return schedule
+    return Response(content=schedule.model_dump_json(), media_type="application/json")
@@ -7,11 +7,12 @@ from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import httpx
 import hashlib
+import numpy as np
 import json
 from datetime import datetime, timedelta
-from utils.logger import setup_api_logger
+from utils.logger import api_log as logger
+from utils.geocoding_helpers import haversine_matrix, throttle_nominatim
 
-logger = setup_api_logger()
 router = APIRouter(prefix="/osm", tags=["OSM Services"])
 
 # Simple in-memory cache (for production use Redis)
@@ -257,57 +258,20 @@ async def optimize_route(req: OptimizeRequest):
     
     # Calcular matriz de distancias usando fórmula de Haversine (más precisa para coordenadas geográficas)
     # Para una mejor precisión, podríamos usar OSRM /table, pero es más lento
-    from math import radians, sin, cos, sqrt, atan2
-    
-    def haversine_distance(lat1, lon1, lat2, lon2):
-        """Calcular distancia entre dos puntos usando fórmula de Haversine (en grados)"""
-        # Convertir a radianes
-        lat1_rad = radians(lat1)
-        lon1_rad = radians(lon1)
-        lat2_rad = radians(lat2)
-        lon2_rad = radians(lon2)
-        
-        # Diferencia de latitud y longitud
-        dlat = lat2_rad - lat1_rad
-        dlon = lon2_rad - lon1_rad
-        
-        # Fórmula de Haversine
-        a = sin(dlat / 2)**2 + cos(lat1_rad) * cos(lat2_rad) * sin(dlon / 2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1 - a))
-        
-        # Retornar distancia (aproximada, suficiente para comparar)
-        return c
-    
     n = len(req.points)
-    distances = [[0.0] * n for _ in range(n)]
-    
-    for i in range(n):
-        for j in range(i + 1, n):
-            # Distancia usando Haversine
-            lat1, lon1 = req.points[i]
-            lat2, lon2 = req.points[j]
-            dist = haversine_distance(lat1, lon1, lat2, lon2)
-            distances[i][j] = dist
-            distances[j][i] = dist
+    distances = haversine_matrix([p[0] for p in req.points], [p[1] for p in req.points])
     
     # Algoritmo Nearest Neighbor para TSP
-    visited = [False] * n
+    visited = np.zeros(n, dtype=bool)
     order = [0]  # Empezar desde el primer punto
     visited[0] = True
     
     for _ in range(n - 1):
-        current = order[-1]
-        nearest = None
-        min_dist = float('inf')
-        
-        for j in range(n):
-            if not visited[j] and distances[current][j] < min_dist:
-                min_dist = distances[current][j]
-                nearest = j
-        
-        if nearest is not None:
-            order.append(nearest)
-            visited[nearest] = True
+        # Vecino más cercano no visitado: argmin sobre la fila con los visitados enmascarados
+        row = np.where(visited, np.inf, distances[order[-1]])
+        nearest = int(row.argmin())
+        order.append(nearest)
+        visited[nearest] = True
     
     # Si roundtrip, agregar regreso al inicio
     if req.roundtrip:
@@ -394,6 +358,7 @@ async def geocode_forward(req: GeocodeRequest):
     
     try:
         async with httpx.AsyncClient(timeout=30.0) as client:
+            await throttle_nominatim()
             resp = await client.get(
                 "https://nominatim.openstreetmap.org/search",
                 params=params,
@@ -440,6 +405,7 @@ async def geocode_reverse(req: ReverseGeocodeRequest):
     
     try:
         async with httpx.AsyncClient(timeout=30.0) as client:
+            await throttle_nominatim()
             resp = await client.get(
                 "https://nominatim.openstreetmap.org/reverse",
                 params=params,
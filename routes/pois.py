@@ -9,7 +9,7 @@ from models.POI import POI
 from models.ItineraryItem import ItineraryItem
 from schemas import POIWrite, POIRead, POIUpdate
 from database import get_db
-from utils.geocoding_helpers import geocode_place_to_coords, reverse_geocode_coords, build_place_query, haversine_distance
+from utils.geocoding_helpers import geocode_place_to_coords, reverse_geocode_coords, haversine_distance
 
 router = APIRouter(prefix="/trips/{trip_id}/pois", tags=["POIs"])
 
@@ -26,11 +26,7 @@ async def create_poi(trip_id: int, payload: POIWrite, db: Session = Depends(get_
     
     # Auto-geocode: if no coords but address/place provided, geocode to get coords
     if data.get("lat") is None or data.get("lng") is None:
-        place_query = build_place_query(
-            city=data.get("city"),
-            country=data.get("country"),
-            address=data.get("address") or data.get("place_name")
-        )
+        place_query = payload.place_query
         if place_query:
             result = await geocode_place_to_coords(place_query)
             if result:
@@ -1,8 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc
+from sqlalchemy import desc, func
 from typing import List, Optional
-from datetime import datetime
 
 from database import get_db
 from models.PublicRoute import PublicRoute
@@ -110,7 +109,7 @@ def publish_trip_as_route(
         center_lat=trip.center_lat,
         center_lng=trip.center_lng,
         is_published=True,
-        published_at=datetime.utcnow(),
+        published_at=func.now(),  # DB clock, timezone-aware
     )
     
     db.add(new_route)
@@ -136,9 +135,8 @@ def publish_trip_as_route(
     trip.is_public = True
     
     db.commit()
+    # author is lazy="joined", so this single refresh reloads it together with the route columns
     db.refresh(new_route)
-    # Load author relationship
-    db.refresh(new_route, ['author'])
     
     return _add_author_username(new_route)
 
@@ -236,7 +234,7 @@ def update_public_route(
         raise HTTPException(status_code=403, detail="Not authorized to update this route")
     
     # Update fields
-    update_data = route_update.dict(exclude_unset=True)
+    update_data = route_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(route, field, value)
     
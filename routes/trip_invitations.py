@@ -1,68 +1,41 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, joinedload, selectinload, raiseload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import select, update, func, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import List, Optional
-from datetime import datetime
 from models.TripInvitation import TripInvitation, InvitationStatus
 from models.Trip import Trip
 from models.TripMember import TripMember
 from models.User import User
-from schemas import TripInvitationWrite, TripInvitationRead, TripRead, UserRead
+from schemas import TripInvitationWrite, TripInvitationRead
 from database import get_db
 
 router = APIRouter(prefix="/trips/{trip_id}/invitations", tags=["Trip Invitations"])
 
+# Mismo contrato que /invitations: TripInvitationRead validado y serializado en el núcleo de Pydantic
+_invitation_list_adapter = TypeAdapter(List[TripInvitationRead])
 
-def _invitation_to_read(invitation: TripInvitation) -> dict:
-    """Helper to convert TripInvitation to TripInvitationRead dict"""
-    result = {
-        "id": invitation.id,
-        "trip_id": invitation.trip_id,
-        "invited_user_id": invitation.invited_user_id,
-        "invited_by_id": invitation.invited_by_id,
-        "message": invitation.message,
-        "status": invitation.status.value if isinstance(invitation.status, InvitationStatus) else invitation.status,
-        "created_at": invitation.created_at,
-        "responded_at": invitation.responded_at,
-    }
-    
-    # Include trip info if available
-    if invitation.trip:
-        result["trip"] = {
-            "id": invitation.trip.id,
-            "title": invitation.trip.title,
-            "description": invitation.trip.description,
-            "start_date": invitation.trip.start_date,
-            "end_date": invitation.trip.end_date,
-            "city": invitation.trip.city,
-            "country": invitation.trip.country,
-            "is_public": invitation.trip.is_public,
-            "owner_id": invitation.trip.owner_id,
-            "created_at": invitation.trip.created_at,
-            "updated_at": invitation.trip.updated_at,
-        }
-    
-    # Include invited_by user info if available
-    if invitation.invited_by:
-        result["invited_by"] = {
-            "firebase_uid": invitation.invited_by.firebase_uid,
-            "username": invitation.invited_by.username,
-            "email": invitation.invited_by.email,
-            "profile_image_url": invitation.invited_by.profile_image_url,
-        }
-    
-    # Include invited_user info if available
-    if invitation.invited_user:
-        result["invited_user"] = {
-            "firebase_uid": invitation.invited_user.firebase_uid,
-            "username": invitation.invited_user.username,
-            "email": invitation.invited_user.email,
-            "profile_image_url": invitation.invited_user.profile_image_url,
-        }
-    
-    return result
+
+def _get_invitation_with_relations(
+    db: Session, invitation_id: int, invited_user_id: Optional[str] = None
+) -> Optional[TripInvitation]:
+    """Load an invitation with trip, invited_by and invited_user in a single SELECT"""
+    query = db.query(TripInvitation).options(
+        joinedload(TripInvitation.trip),
+        joinedload(TripInvitation.invited_by),
+        joinedload(TripInvitation.invited_user)
+    ).filter(
+        TripInvitation.id == invitation_id
+    )
+    if invited_user_id is not None:
+        query = query.filter(TripInvitation.invited_user_id == invited_user_id)
+    return query.one_or_none()
 
 
-@router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=TripInvitationRead, status_code=status.HTTP_201_CREATED)
 def create_invitation(
     trip_id: int,
     payload: TripInvitationWrite,
@@ -82,10 +55,12 @@ def create_invitation(
     
     # Verificar que el usuario que invita es el dueño o un colaborador
     if trip.owner_id != invited_by_id:
-        is_member = db.query(TripMember).filter(
-            TripMember.trip_id == trip_id,
-            TripMember.user_id == invited_by_id
-        ).first()
+        is_member = db.query(
+            db.query(TripMember).filter(
+                TripMember.trip_id == trip_id,
+                TripMember.user_id == invited_by_id
+            ).exists()
+        ).scalar()
         if not is_member:
             raise HTTPException(status_code=403, detail="No tienes permiso para invitar a este viaje")
     
@@ -98,20 +73,24 @@ def create_invitation(
     if invited_user.firebase_uid == invited_by_id:
         raise HTTPException(status_code=400, detail="No puedes invitarte a ti mismo")
     
-    # Verificar que no sea ya miembro
-    existing_member = db.query(TripMember).filter(
-        TripMember.trip_id == trip_id,
-        TripMember.user_id == invited_user.firebase_uid
-    ).first()
+    # Verificar que no sea ya miembro (EXISTS sobre el índice único uq_trip_member)
+    existing_member = db.query(
+        db.query(TripMember).filter(
+            TripMember.trip_id == trip_id,
+            TripMember.user_id == invited_user.firebase_uid
+        ).exists()
+    ).scalar()
     if existing_member:
         raise HTTPException(status_code=400, detail="Este usuario ya es miembro del viaje")
     
-    # Verificar que no haya una invitación pendiente
-    existing_invitation = db.query(TripInvitation).filter(
-        TripInvitation.trip_id == trip_id,
-        TripInvitation.invited_user_id == invited_user.firebase_uid,
-        TripInvitation.status == InvitationStatus.PENDING
-    ).first()
+    # Verificar que no haya una invitación pendiente (EXISTS sobre el índice único uq_trip_invitation)
+    existing_invitation = db.query(
+        db.query(TripInvitation).filter(
+            TripInvitation.trip_id == trip_id,
+            TripInvitation.invited_user_id == invited_user.firebase_uid,
+            TripInvitation.status == InvitationStatus.PENDING
+        ).exists()
+    ).scalar()
     if existing_invitation:
         raise HTTPException(status_code=400, detail="Ya existe una invitación pendiente para este usuario")
     
@@ -121,14 +100,15 @@ def create_invitation(
         invited_user_id=invited_user.firebase_uid,
         invited_by_id=invited_by_id,
         message=payload.message,
-        status=InvitationStatus.PENDING
+        status=InvitationStatus.PENDING.value
     )
     db.add(invitation)
+    db.flush()
+    invitation_id = invitation.id
     db.commit()
-    db.refresh(invitation)
     
-    # Load relationships
-    db.refresh(invitation, ['trip', 'invited_by', 'invited_user'])
+    # Recargar con las relaciones en un solo SELECT
+    invitation = _get_invitation_with_relations(db, invitation_id)
     
     # Enviar notificación push al usuario invitado
     try:
@@ -155,25 +135,33 @@ def create_invitation(
         print(f"⚠️ Error enviando notificación: {e}")
         # No fallar si la notificación no se puede enviar
     
-    return _invitation_to_read(invitation)
+    return TripInvitationRead.model_validate(invitation)
 
 
-@router.get("/", response_model=List[dict])
+@router.get("/", response_model=List[TripInvitationRead])
 def list_invitations(
     trip_id: int,
     db: Session = Depends(get_db)
 ):
     """Listar todas las invitaciones de un viaje"""
-    invitations = db.query(TripInvitation).options(
-        joinedload(TripInvitation.trip),
-        joinedload(TripInvitation.invited_by),
-        joinedload(TripInvitation.invited_user)
-    ).filter(
-        TripInvitation.trip_id == trip_id
-    ).all()
-    return [_invitation_to_read(inv) for inv in invitations]
-
-
+    # Todas las invitaciones son del mismo viaje: selectinload lo carga una sola vez en vez de
+    # repetir la fila del viaje en cada fila; los usuarios van por JOIN.
+    # raiseload("*") falla ante cualquier lazy load accidental
+    invitations = db.execute(
+        select(TripInvitation).options(
+            selectinload(TripInvitation.trip),
+            joinedload(TripInvitation.invited_by),
+            joinedload(TripInvitation.invited_user),
+            raiseload("*")
+        ).where(TripInvitation.trip_id == trip_id)
+    ).scalars().all()
+    # Validación y serialización a JSON en una sola pasada del núcleo de Pydantic
+    return Response(
+        content=_invitation_list_adapter.dump_json(
+            _invitation_list_adapter.validate_python(invitations, from_attributes=True)
+        ),
+        media_type="application/json",
+    )
 
 
 @router.post("/{invitation_id}/accept", status_code=status.HTTP_200_OK)
@@ -183,35 +171,41 @@ def accept_invitation(
     db: Session = Depends(get_db)
 ):
     """Aceptar una invitación"""
-    invitation = db.query(TripInvitation).filter(
-        TripInvitation.id == invitation_id,
-        TripInvitation.invited_user_id == user_id
-    ).first()
+    # Un solo SELECT con las relaciones que necesita la respuesta
+    invitation = _get_invitation_with_relations(db, invitation_id, user_id)
     
     if not invitation:
         raise HTTPException(status_code=404, detail="Invitación no encontrada")
     
-    if invitation.status != InvitationStatus.PENDING:
+    # Actualizar el estado solo si sigue pendiente (check-and-set atómico, sin carreras);
+    # RETURNING trae responded_at sin expirar ni recargar la invitación
+    responded_at = db.scalar(
+        update(TripInvitation)
+        .where(
+            TripInvitation.id == invitation.id,
+            TripInvitation.status == InvitationStatus.PENDING.value
+        )
+        .values(status=InvitationStatus.ACCEPTED.value, responded_at=func.now())
+        .returning(TripInvitation.responded_at)
+        .execution_options(synchronize_session=False)
+    )
+    if responded_at is None:
         raise HTTPException(status_code=400, detail="Esta invitación ya fue respondida")
+    set_committed_value(invitation, "status", InvitationStatus.ACCEPTED.value)
+    set_committed_value(invitation, "responded_at", responded_at)
     
-    # Actualizar el estado de la invitación
-    invitation.status = InvitationStatus.ACCEPTED
-    invitation.responded_at = datetime.utcnow()
-    
-    # Crear el miembro del viaje
-    member = TripMember(
-        trip_id=invitation.trip_id,
-        user_id=invitation.invited_user_id,
-        role="collaborator"
+    # Crear el miembro del viaje (ON CONFLICT evita duplicados si ya es miembro)
+    db.execute(
+        pg_insert(TripMember)
+        .values(trip_id=invitation.trip_id, user_id=invitation.invited_user_id, role="collaborator")
+        .on_conflict_do_nothing(index_elements=["trip_id", "user_id"])
     )
-    db.add(member)
-    db.commit()
-    db.refresh(invitation)
     
-    # Load relationships
-    db.refresh(invitation, ['trip', 'invited_by', 'invited_user'])
+    # Serializar antes del commit: el commit expira la invitación y las relaciones ya cargadas
+    invitation_read = TripInvitationRead.model_validate(invitation)
+    db.commit()
     
-    return {"message": "Invitación aceptada", "invitation": _invitation_to_read(invitation)}
+    return {"message": "Invitación aceptada", "invitation": invitation_read}
 
 
 @router.post("/{invitation_id}/reject", status_code=status.HTTP_200_OK)
@@ -221,28 +215,34 @@ def reject_invitation(
     db: Session = Depends(get_db)
 ):
     """Rechazar una invitación"""
-    invitation = db.query(TripInvitation).filter(
-        TripInvitation.id == invitation_id,
-        TripInvitation.invited_user_id == user_id
-    ).first()
-    
-    if not invitation:
-        raise HTTPException(status_code=404, detail="Invitación no encontrada")
-    
-    if invitation.status != InvitationStatus.PENDING:
+    # Actualizar el estado solo si sigue pendiente (check-and-set atómico, sin carreras)
+    result = db.execute(
+        update(TripInvitation)
+        .where(
+            TripInvitation.id == invitation_id,
+            TripInvitation.invited_user_id == user_id,
+            TripInvitation.status == InvitationStatus.PENDING.value
+        )
+        .values(status=InvitationStatus.REJECTED.value, responded_at=func.now())
+    )
+    if result.rowcount == 0:
+        # Ninguna fila actualizada: una consulta EXISTS distingue 404 de 400
+        found = db.scalar(
+            select(exists().where(
+                TripInvitation.id == invitation_id,
+                TripInvitation.invited_user_id == user_id
+            ))
+        )
+        if not found:
+            raise HTTPException(status_code=404, detail="Invitación no encontrada")
         raise HTTPException(status_code=400, detail="Esta invitación ya fue respondida")
     
-    # Actualizar el estado de la invitación
-    invitation.status = InvitationStatus.REJECTED
-    invitation.responded_at = datetime.utcnow()
-    
     db.commit()
-    db.refresh(invitation)
     
-    # Load relationships
-    db.refresh(invitation, ['trip', 'invited_by', 'invited_user'])
+    # Recargar con las relaciones en un solo SELECT
+    invitation = _get_invitation_with_relations(db, invitation_id)
     
-    return {"message": "Invitación rechazada", "invitation": _invitation_to_read(invitation)}
+    return {"message": "Invitación rechazada", "invitation": TripInvitationRead.model_validate(invitation)}
 
 
 @router.delete("/{invitation_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,7 +1,7 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import or_, select
 
 from models.Trip import Trip
 from models.User import User
@@ -11,29 +11,32 @@ from database import get_db
 from utils.geocoding_helpers import (
     geocode_place_to_coords,
     reverse_geocode_coords,
-    build_place_query
 )
-import json
+from utils.logger import api_log as api_logger
+import logging
+import orjson
 
 router = APIRouter(prefix="/trips", tags=["Trips"])
 @router.get("/by_owner/{firebase_uid}")
 def get_trips_by_owner_or_member(firebase_uid: str, db: Session = Depends(get_db)):
 
+    # IN (subquery) instead of OUTER JOIN + DISTINCT: no duplicated rows to sort away
+    member_trip_ids = select(TripMember.trip_id).where(TripMember.user_id == firebase_uid)
+
     trips = (
         db.query(Trip)
         .options(
             joinedload(Trip.owner),
-            joinedload(Trip.members).joinedload(TripMember.user),
-            joinedload(Trip.pois),
+            # selectinload for collections: joining both would multiply rows (members x pois)
+            selectinload(Trip.members).joinedload(TripMember.user),
+            selectinload(Trip.pois),
         )
-        .outerjoin(TripMember, Trip.id == TripMember.trip_id)
         .filter(
             or_(
                 Trip.owner_id == firebase_uid,
-                TripMember.user_id == firebase_uid
+                Trip.id.in_(member_trip_ids)
             )
         )
-        .distinct()
         .all()
     )
 
@@ -84,8 +87,9 @@ def get_trips_by_owner_or_member(firebase_uid: str, db: Session = Depends(get_db
             }
         })
 
-    print("\n📤 Enviando trips normalizados:")
-    print(json.dumps(normalized, default=str, ensure_ascii=False, indent=2))
+    # orjson serializa date/datetime de forma nativa (sin default=str); solo se paga con DEBUG activo
+    if api_logger.isEnabledFor(logging.DEBUG):
+        api_logger.debug("📤 Enviando trips normalizados:\n%s", orjson.dumps(normalized, option=orjson.OPT_INDENT_2).decode())
 
     return normalized
 
@@ -98,11 +102,7 @@ async def create_trip(payload: TripWrite, db: Session = Depends(get_db)):
     data = payload.model_dump()
 
     if data.get("center_lat") is None or data.get("center_lng") is None:
-        place_query = build_place_query(
-            city=data.get("city"),
-            country=data.get("country"),
-            address=data.get("address")
-        )
+        place_query = payload.place_query
         if place_query:
             result = await geocode_place_to_coords(place_query)
             if result:
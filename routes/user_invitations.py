@@ -1,156 +1,133 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import joinedload, selectinload, raiseload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import List, Optional
-from datetime import datetime
 from models.TripInvitation import TripInvitation, InvitationStatus
 from models.TripMember import TripMember
 from schemas import TripInvitationRead
 
 router = APIRouter(prefix="/invitations", tags=["User Invitations"])
-from database import get_db
+from database import get_async_db
 
+# Validación de status_filter sin excepciones: búsqueda directa por valor
+_STATUS_BY_VALUE = {m.value: m for m in InvitationStatus}
 
-def _invitation_to_read(invitation: TripInvitation) -> dict:
-    """Helper to convert TripInvitation to TripInvitationRead dict"""
-    result = {
-        "id": invitation.id,
-        "trip_id": invitation.trip_id,
-        "invited_user_id": invitation.invited_user_id,
-        "invited_by_id": invitation.invited_by_id,
-        "message": invitation.message,
-        "status": invitation.status.value if isinstance(invitation.status, InvitationStatus) else invitation.status,
-        "created_at": invitation.created_at,
-        "responded_at": invitation.responded_at,
-    }
-    
-    # Include trip info if available
-    if invitation.trip:
-        result["trip"] = {
-            "id": invitation.trip.id,
-            "title": invitation.trip.title,
-            "description": invitation.trip.description,
-            "start_date": invitation.trip.start_date,
-            "end_date": invitation.trip.end_date,
-            "city": invitation.trip.city,
-            "country": invitation.trip.country,
-            "is_public": invitation.trip.is_public,
-            "owner_id": invitation.trip.owner_id,
-            "created_at": invitation.trip.created_at,
-            "updated_at": invitation.trip.updated_at,
-        }
-    
-    # Include invited_by user info if available
-    if invitation.invited_by:
-        result["invited_by"] = {
-            "firebase_uid": invitation.invited_by.firebase_uid,
-            "username": invitation.invited_by.username,
-            "email": invitation.invited_by.email,
-            "profile_image_url": invitation.invited_by.profile_image_url,
-        }
-    
-    # Include invited_user info if available
-    if invitation.invited_user:
-        result["invited_user"] = {
-            "firebase_uid": invitation.invited_user.firebase_uid,
-            "username": invitation.invited_user.username,
-            "email": invitation.invited_user.email,
-            "profile_image_url": invitation.invited_user.profile_image_url,
-        }
-    
-    return result
+# Serializador de Pydantic v2 (núcleo en Rust) que recorre directamente el grafo ORM
+_invitation_list_adapter = TypeAdapter(List[TripInvitationRead])
+
+
+async def _get_invitation_with_relations(db: AsyncSession, invitation_id: int) -> TripInvitation:
+    """Load an invitation with trip, invited_by and invited_user in a single SELECT"""
+    return (await db.execute(
+        select(TripInvitation).options(
+            joinedload(TripInvitation.trip),
+            joinedload(TripInvitation.invited_by),
+            joinedload(TripInvitation.invited_user)
+        ).where(TripInvitation.id == invitation_id)
+    )).scalar_one()
 
 
-@router.get("/user/{user_id}", response_model=List[dict])
-def list_user_invitations(
+async def _respond_to_invitation(
+    db: AsyncSession, invitation_id: int, user_id: str, new_status: InvitationStatus
+) -> int:
+    """
+    UPDATE ... WHERE status = 'pending' RETURNING trip_id.
+    Si no se actualizó ninguna fila, una consulta EXISTS distingue 404 de 400.
+    """
+    trip_id = await db.scalar(
+        update(TripInvitation)
+        .where(
+            TripInvitation.id == invitation_id,
+            TripInvitation.invited_user_id == user_id,
+            TripInvitation.status == InvitationStatus.PENDING.value
+        )
+        .values(status=new_status.value, responded_at=func.now())
+        .returning(TripInvitation.trip_id)
+    )
+    if trip_id is None:
+        found = await db.scalar(
+            select(exists().where(
+                TripInvitation.id == invitation_id,
+                TripInvitation.invited_user_id == user_id
+            ))
+        )
+        if not found:
+            raise HTTPException(status_code=404, detail="Invitación no encontrada")
+        raise HTTPException(status_code=400, detail="Esta invitación ya fue respondida")
+    return trip_id
+
+
+@router.get("/user/{user_id}", response_model=List[TripInvitationRead])
+async def list_user_invitations(
     user_id: str,
     status_filter: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Listar todas las invitaciones de un usuario"""
-    query = db.query(TripInvitation).options(
-        joinedload(TripInvitation.trip),
-        joinedload(TripInvitation.invited_by),
-        joinedload(TripInvitation.invited_user)
-    ).filter(
+    # selectinload: un SELECT ... IN por relación; raiseload("*") falla ante cualquier lazy load accidental
+    stmt = select(TripInvitation).options(
+        selectinload(TripInvitation.trip),
+        selectinload(TripInvitation.invited_by),
+        selectinload(TripInvitation.invited_user),
+        raiseload("*")
+    ).where(
         TripInvitation.invited_user_id == user_id
     )
     
     if status_filter:
-        try:
-            status_enum = InvitationStatus(status_filter)
-            query = query.filter(TripInvitation.status == status_enum)
-        except ValueError:
+        status_enum = _STATUS_BY_VALUE.get(status_filter)
+        if status_enum is None:
             raise HTTPException(status_code=400, detail=f"Status inválido: {status_filter}")
-    
-    invitations = query.all()
-    return [_invitation_to_read(inv) for inv in invitations]
+        stmt = stmt.where(TripInvitation.status == status_enum)
+    
+    invitations = (await db.execute(stmt)).scalars().all()
+    # Validación y serialización a JSON en una sola pasada del núcleo de Pydantic
+    return Response(
+        content=_invitation_list_adapter.dump_json(
+            _invitation_list_adapter.validate_python(invitations, from_attributes=True)
+        ),
+        media_type="application/json",
+    )
 
 
 @router.post("/{invitation_id}/accept", status_code=status.HTTP_200_OK)
-def accept_invitation(
+async def accept_invitation(
     invitation_id: int,
     user_id: str = Query(..., description="ID del usuario que acepta la invitación"),  # En producción, obtener del token de autenticación
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Aceptar una invitación"""
-    invitation = db.query(TripInvitation).filter(
-        TripInvitation.id == invitation_id,
-        TripInvitation.invited_user_id == user_id
-    ).first()
-    
-    if not invitation:
-        raise HTTPException(status_code=404, detail="Invitación no encontrada")
-    
-    if invitation.status != InvitationStatus.PENDING:
-        raise HTTPException(status_code=400, detail="Esta invitación ya fue respondida")
-    
-    # Actualizar el estado de la invitación
-    invitation.status = InvitationStatus.ACCEPTED
-    invitation.responded_at = datetime.utcnow()
+    trip_id = await _respond_to_invitation(db, invitation_id, user_id, InvitationStatus.ACCEPTED)
     
-    # Crear el miembro del viaje
-    member = TripMember(
-        trip_id=invitation.trip_id,
-        user_id=invitation.invited_user_id,
-        role="collaborator"
+    # Crear el miembro del viaje en la misma transacción (ON CONFLICT evita duplicados si ya es miembro)
+    await db.execute(
+        pg_insert(TripMember)
+        .values(trip_id=trip_id, user_id=user_id, role="collaborator")
+        .on_conflict_do_nothing(index_elements=["trip_id", "user_id"])
     )
-    db.add(member)
-    db.commit()
-    db.refresh(invitation)
     
-    # Load relationships
-    db.refresh(invitation, ['trip', 'invited_by', 'invited_user'])
+    # Un solo SELECT con las relaciones que necesita la respuesta
+    invitation = await _get_invitation_with_relations(db, invitation_id)
+    await db.commit()
     
-    return {"message": "Invitación aceptada", "invitation": _invitation_to_read(invitation)}
+    return {"message": "Invitación aceptada", "invitation": TripInvitationRead.model_validate(invitation)}
 
 
 @router.post("/{invitation_id}/reject", status_code=status.HTTP_200_OK)
-def reject_invitation(
+async def reject_invitation(
     invitation_id: int,
     user_id: str = Query(..., description="ID del usuario que rechaza la invitación"),  # En producción, obtener del token de autenticación
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Rechazar una invitación"""
-    invitation = db.query(TripInvitation).filter(
-        TripInvitation.id == invitation_id,
-        TripInvitation.invited_user_id == user_id
-    ).first()
+    await _respond_to_invitation(db, invitation_id, user_id, InvitationStatus.REJECTED)
     
-    if not invitation:
-        raise HTTPException(status_code=404, detail="Invitación no encontrada")
+    # Un solo SELECT con las relaciones que necesita la respuesta
+    invitation = await _get_invitation_with_relations(db, invitation_id)
+    await db.commit()
     
-    if invitation.status != InvitationStatus.PENDING:
-        raise HTTPException(status_code=400, detail="Esta invitación ya fue respondida")
-    
-    # Actualizar el estado de la invitación
-    invitation.status = InvitationStatus.REJECTED
-    invitation.responded_at = datetime.utcnow()
-    
-    db.commit()
-    db.refresh(invitation)
-    
-    # Load relationships
-    db.refresh(invitation, ['trip', 'invited_by', 'invited_user'])
-    
-    return {"message": "Invitación rechazada", "invitation": _invitation_to_read(invitation)}
-
+    return {"message": "Invitación rechazada", "invitation": TripInvitationRead.model_validate(invitation)}
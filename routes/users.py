@@ -1,16 +1,56 @@
 from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.responses import Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, exists, null, bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from models.User import User
 from models.Follow import Follow
 from schemas import UserWrite, UserRead, UserUpdate, UserProfileRead, FCMTokenUpdate
-from database import get_db
-from utils import get_password_hash
+from database import get_db, get_async_db
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+# Hot statements built once at import; only the bound parameters change per request
+_SEL_USER_BY_UID = select(User).where(User.firebase_uid == bindparam("uid"))
+_SEL_USERS_READ = select(
+    User.firebase_uid,
+    User.username,
+    User.email,
+    User.bio,
+    User.profile_image_url,
+    User.followers_count,
+    User.following_count,
+    User.created_at,
+    User.updated_at,
+)
+_SEL_PROFILE = select(
+    User,
+    null().label("is_following"),
+    null().label("is_followed_by"),
+).where(User.firebase_uid == bindparam("uid"))
+_SEL_PROFILE_WITH_FOLLOWS = select(
+    User,
+    exists().where(
+        Follow.follower_id == bindparam("viewer"),
+        Follow.following_id == bindparam("uid")
+    ).label("is_following"),
+    exists().where(
+        Follow.follower_id == bindparam("uid"),
+        Follow.following_id == bindparam("viewer")
+    ).label("is_followed_by"),
+).where(User.firebase_uid == bindparam("uid"))
+_users_read_adapter = TypeAdapter(List[UserRead])
+_UPD_FCM_TOKEN = (
+    update(User)
+    .where(User.firebase_uid == bindparam("uid"))
+    .values(fcm_token=bindparam("fcm_token"))
+    .returning(User.firebase_uid)
+)
+
 
 @router.post(
     "/",
@@ -18,70 +58,67 @@ router = APIRouter(prefix="/users", tags=["Users"])
     status_code=status.HTTP_201_CREATED,
 )
 def create_user(payload: UserWrite, db: Session = Depends(get_db)):
-    exists = db.query(User).filter(
-        or_(User.firebase_uid == payload.firebase_uid, User.username == payload.username, User.email == payload.email)
-    ).first()
-    if exists:
+    # Uniqueness is enforced by the unique indexes on firebase_uid/username/email:
+    # ON CONFLICT DO NOTHING inserts atomically and returns no row if any of them collide
+    new_user = db.scalar(
+        pg_insert(User)
+        .values(
+            firebase_uid=payload.firebase_uid,
+            username=payload.username,
+            email=payload.email,
+        )
+        .on_conflict_do_nothing()
+        .returning(User)
+    )
+    if new_user is None:
         raise HTTPException(status_code=409, detail="UID, username o email ya existen")
 
-    new_user = User(
-        firebase_uid=payload.firebase_uid,
-        username=payload.username,
-        email=payload.email,
-    )
-    db.add(new_user)
+    # Detach the RETURNING row so commit does not expire it (avoids a reload SELECT)
+    db.expunge(new_user)
     db.commit()
-    db.refresh(new_user)
     return new_user
 
 
 @router.get("/", response_model=List[UserRead])
 def get_users(db: Session = Depends(get_db)):
-    return db.query(User).all()
+    # Column-only projection of the UserRead fields (no ORM hydration), validated and
+    # dumped in one pass so datetimes are encoded exactly like the detail routes
+    rows = db.execute(_SEL_USERS_READ).mappings().all()
+    return Response(
+        content=_users_read_adapter.dump_json(_users_read_adapter.validate_python(rows)),
+        media_type="application/json",
+    )
 
 
 @router.get("/{user_id}", response_model=UserRead)
-def get_user(user_id: str, db: Session = Depends(get_db)):
+async def get_user(user_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Get a user by ID.
     """
-    user = db.query(User).filter(User.firebase_uid == user_id).first()
+    user = await db.scalar(_SEL_USER_BY_UID, {"uid": user_id})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
 @router.get("/{user_id}/profile", response_model=UserProfileRead)
-def get_user_profile(
+async def get_user_profile(
     user_id: str,
     current_user_id: Optional[str] = None,  # In production, get from auth token
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get user profile with follow status.
     """
-    user = db.query(User).filter(User.firebase_uid == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    # Check follow status if current_user_id is provided
-    is_following = None
-    is_followed_by = None
-    
+    # Fetch the user and both follow directions in a single statement
     if current_user_id:
-        # Check if current user follows this user
-        follow = db.query(Follow).filter(
-            Follow.follower_id == current_user_id,
-            Follow.following_id == user_id
-        ).first()
-        is_following = follow is not None
-        
-        # Check if this user follows current user
-        reverse_follow = db.query(Follow).filter(
-            Follow.follower_id == user_id,
-            Follow.following_id == current_user_id
-        ).first()
-        is_followed_by = reverse_follow is not None
+        result = await db.execute(_SEL_PROFILE_WITH_FOLLOWS, {"uid": user_id, "viewer": current_user_id})
+    else:
+        result = await db.execute(_SEL_PROFILE, {"uid": user_id})
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="User not found")
+    user, is_following, is_followed_by = row
     
     # Convert to dict and add follow status
     profile_dict = {
@@ -102,41 +139,44 @@ def get_user_profile(
 
 
 @router.patch("/{user_id}", response_model=UserRead)
-def update_user(
+async def update_user(
     user_id: str,
     user_update: UserUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update user profile.
     """
-    user = db.query(User).filter(User.firebase_uid == user_id).first()
+    update_data = user_update.model_dump(exclude_unset=True)
+    if update_data:
+        # Single UPDATE ... RETURNING with only the provided fields (no fetch-then-update)
+        user = await db.scalar(
+            update(User)
+            .where(User.firebase_uid == user_id)
+            .values(**update_data)
+            .returning(User)
+        )
+    else:
+        user = await db.scalar(_SEL_USER_BY_UID, {"uid": user_id})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    update_data = user_update.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(user, key, value)
-    
-    db.commit()
-    db.refresh(user)
+    await db.commit()
     return user
 
 
 @router.put("/{user_id}/fcm-token", status_code=status.HTTP_200_OK)
-def update_fcm_token(
+async def update_fcm_token(
     user_id: str,
     payload: FCMTokenUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Actualizar el token FCM de un usuario"""
-    user = db.query(User).filter(User.firebase_uid == user_id).first()
-    if not user:
+    updated_uid = await db.scalar(_UPD_FCM_TOKEN, {"uid": user_id, "fcm_token": payload.fcm_token})
+    if updated_uid is None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
-    user.fcm_token = payload.fcm_token
-    db.commit()
-    db.refresh(user)
+    await db.commit()
     
     return {"message": "Token FCM actualizado correctamente"}
 
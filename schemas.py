@@ -1,29 +1,36 @@
-# schemas.py (Pydantic v1)
-from pydantic import BaseModel, EmailStr
+# schemas.py (Pydantic v2)
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 from typing import Optional, List
 from datetime import date, datetime
 from enum import Enum
 
+from utils.places import build_place_query
+
+
+class BaseSchema(BaseModel):
+    """Shared base for every DTO; extra="ignore" is Pydantic's default, spelled out here only to make it explicit"""
+    model_config = ConfigDict(extra="ignore")
+
 
 # ---------- Users ----------
-class UserBase(BaseModel):
+class UserBase(BaseSchema):
     firebase_uid: str
     username: str
-    email: EmailStr
+    email: str  # Read side comes from the DB; only UserWrite validates the format
     bio: Optional[str] = None
     profile_image_url: Optional[str] = None
 
 class UserWrite(UserBase):
-    pass
+    email: EmailStr
 
-class UserUpdate(BaseModel):
+class UserUpdate(BaseSchema):
     """Partial update for users"""
     username: Optional[str] = None
     bio: Optional[str] = None
     profile_image_url: Optional[str] = None
     fcm_token: Optional[str] = None  # Firebase Cloud Messaging token
 
-class FCMTokenUpdate(BaseModel):
+class FCMTokenUpdate(BaseSchema):
     """Schema para actualizar el token FCM"""
     fcm_token: str
 
@@ -33,8 +40,7 @@ class UserRead(UserBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserProfileRead(UserRead):
     """Extended user profile with follow status"""
@@ -43,7 +49,7 @@ class UserProfileRead(UserRead):
 
 
 # ---------- Trips ----------
-class TripBase(BaseModel):
+class TripBase(BaseSchema):
     title: str
     description: Optional[str] = None
     start_date: date
@@ -59,6 +65,11 @@ class TripBase(BaseModel):
 class TripWrite(TripBase):
     owner_id: str
 
+    @property
+    def place_query(self) -> Optional[str]:
+        """Geocoding query built from address, city and country (None if all empty)"""
+        return build_place_query(city=self.city, country=self.country, address=self.address)
+
 class TripRead(TripBase):
     id: int
     owner_id: str
@@ -71,12 +82,11 @@ class TripRead(TripBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ---------- Trip Members ----------
-class TripMemberBase(BaseModel):
+class TripMemberBase(BaseSchema):
     role: Optional[str] = None
 
 class TripMemberWrite(TripMemberBase):
@@ -89,12 +99,11 @@ class TripMemberRead(TripMemberBase):
     user_id: str
     joined_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ---------- POIs ----------
-class POIBase(BaseModel):
+class POIBase(BaseSchema):
     name: str
     notes: Optional[str] = None
     # Can provide coords OR address/place; will geocode if only address provided
@@ -111,7 +120,12 @@ class POIBase(BaseModel):
 class POIWrite(POIBase):
     trip_id: int
 
-class POIUpdate(BaseModel):
+    @property
+    def place_query(self) -> Optional[str]:
+        """Geocoding query built from address (or place_name), city and country (None if all empty)"""
+        return build_place_query(city=self.city, country=self.country, address=self.address or self.place_name)
+
+class POIUpdate(BaseSchema):
     """Schema for partial updates (PATCH) - all fields optional"""
     name: Optional[str] = None
     notes: Optional[str] = None
@@ -135,12 +149,11 @@ class POIRead(POIBase):
     country: Optional[str] = None
     place_name: Optional[str] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ---------- Itinerary Items ----------
-class ItineraryItemBase(BaseModel):
+class ItineraryItemBase(BaseSchema):
     name: Optional[str] = None  # For activities without POI
     start_ts: datetime
     end_ts: Optional[datetime] = None
@@ -155,12 +168,11 @@ class ItineraryItemRead(ItineraryItemBase):
     trip_id: int
     poi_id: Optional[int] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ---------- Schedule (Combined POIs and ItineraryItems) ----------
-class ScheduleActivity(BaseModel):
+class ScheduleActivity(BaseSchema):
     """Represents an activity in the schedule (POI or ItineraryItem)"""
     id: str  # "poi_{id}" or "item_{id}"
     type: str  # "poi" or "itinerary_item"
@@ -176,19 +188,19 @@ class ScheduleActivity(BaseModel):
     estimated_cost: Optional[float] = None
     description: Optional[str] = None
 
-class FreeTimeSlot(BaseModel):
+class FreeTimeSlot(BaseSchema):
     """Represents free time between activities"""
     start_time: datetime
     end_time: datetime
     duration_minutes: int
 
-class ScheduleDay(BaseModel):
+class ScheduleDay(BaseSchema):
     """Schedule for a specific day"""
     date: date
     activities: List[ScheduleActivity] = []
     free_time_slots: List[FreeTimeSlot] = []
 
-class TripSchedule(BaseModel):
+class TripSchedule(BaseSchema):
     """Complete schedule for a trip"""
     trip_id: int
     days: List[ScheduleDay] = []
@@ -197,7 +209,7 @@ class TripSchedule(BaseModel):
 
 
 # ---------- Chat Messages ----------
-class ChatMessageBase(BaseModel):
+class ChatMessageBase(BaseSchema):
     body: str = ""  # Permitir body vacío si hay archivo
     file_url: Optional[str] = None
     file_type: Optional[str] = None
@@ -213,12 +225,11 @@ class ChatMessageRead(ChatMessageBase):
     user_id: str
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ---------- POI Cost Estimates ----------
-class PoiCostEstimateBase(BaseModel):
+class PoiCostEstimateBase(BaseSchema):
     amount: float
     currency: str = "USD"
 
@@ -231,13 +242,12 @@ class PoiCostEstimateRead(PoiCostEstimateBase):
     poi_id: int
     user_id: str
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ---------- Public Routes (Social Feature) ----------
 
-class PublicRouteStopBase(BaseModel):
+class PublicRouteStopBase(BaseSchema):
     name: str
     description: Optional[str] = None
     lat: Optional[float] = None
@@ -256,11 +266,10 @@ class PublicRouteStopRead(PublicRouteStopBase):
     route_id: int
     order_index: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
-class PublicRouteBase(BaseModel):
+class PublicRouteBase(BaseSchema):
     title: str
     description: Optional[str] = None
     cover_image_url: Optional[str] = None
@@ -268,18 +277,24 @@ class PublicRouteBase(BaseModel):
     total_duration_hours: Optional[float] = None
     estimated_total_cost: Optional[float] = None
     difficulty_level: Optional[str] = None  # easy, moderate, hard
-    tags: Optional[List[str]] = None
+    tags: List[str] = Field(default_factory=list)
     season: Optional[str] = None
     city: Optional[str] = None
     country: Optional[str] = None
     center_lat: Optional[float] = None
     center_lng: Optional[float] = None
 
+    @field_validator("tags", mode="before")
+    @classmethod
+    def _tags_none_as_empty(cls, value):
+        # The tags column is nullable: rows published without tags read back as []
+        return [] if value is None else value
+
 class PublicRouteCreate(PublicRouteBase):
     original_trip_id: Optional[int] = None
     stops: List[PublicRouteStopCreate]
 
-class PublicRouteUpdate(BaseModel):
+class PublicRouteUpdate(BaseSchema):
     """Partial update for public routes"""
     title: Optional[str] = None
     description: Optional[str] = None
@@ -303,51 +318,47 @@ class PublicRouteRead(PublicRouteBase):
     updated_at: datetime
     
     # Include stops
-    stops: List[PublicRouteStopRead] = []
+    stops: List[PublicRouteStopRead] = Field(default_factory=list)
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ---------- Follows ----------
-class FollowCreate(BaseModel):
+class FollowCreate(BaseSchema):
     following_id: str  # ID del usuario a seguir
 
-class FollowRead(BaseModel):
+class FollowRead(BaseSchema):
     id: int
     follower_id: str
     following_id: str
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ---------- Route Interactions ----------
-class RouteLikeCreate(BaseModel):
+class RouteLikeCreate(BaseSchema):
     route_id: int
 
-class RouteLikeRead(BaseModel):
+class RouteLikeRead(BaseSchema):
     id: int
     route_id: int
     user_id: str
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
-class RouteSaveCreate(BaseModel):
+class RouteSaveCreate(BaseSchema):
     route_id: int
 
-class RouteSaveRead(BaseModel):
+class RouteSaveRead(BaseSchema):
     id: int
     route_id: int
     user_id: str
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ---------- Trip Invitations ----------
@@ -356,18 +367,18 @@ class InvitationStatus(str, Enum):
     ACCEPTED = "accepted"
     REJECTED = "rejected"
 
-class TripInvitationBase(BaseModel):
+class TripInvitationBase(BaseSchema):
     trip_id: int
     invited_user_id: str
     invited_by_id: str
     message: Optional[str] = None
     status: InvitationStatus = InvitationStatus.PENDING
 
-class TripInvitationWrite(BaseModel):
+class TripInvitationWrite(BaseSchema):
     email: str  # Email del usuario a invitar
     message: Optional[str] = None  # Mensaje opcional
 
-class TripInvitationRead(BaseModel):
+class TripInvitationRead(BaseSchema):
     id: int
     trip_id: int
     invited_user_id: str
@@ -380,5 +391,4 @@ class TripInvitationRead(BaseModel):
     invited_by: Optional[UserRead] = None  # Quien invitó
     invited_user: Optional[UserRead] = None  # Usuario invitado
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
@@ -1,8 +1,28 @@
+import asyncio
 import firebase_admin
 from firebase_admin import credentials, messaging
 import os
 from typing import Optional
 
+from utils.logger import api_log as log
+
+# Configuración de plataforma idéntica en todas las notificaciones: se construye una sola vez
+_APNS_CONFIG = messaging.APNSConfig(
+    payload=messaging.APNSPayload(
+        aps=messaging.Aps(
+            badge=1,
+            sound="default",
+        ),
+    ),
+)
+_ANDROID_CONFIG = messaging.AndroidConfig(
+    priority="high",
+    notification=messaging.AndroidNotification(
+        sound="default",
+        channel_id="high_importance_channel",
+    ),
+)
+
 # Inicializar Firebase Admin (solo una vez)
 _initialized = False
 
@@ -21,19 +41,21 @@ def initialize_firebase_admin():
                 cred = credentials.Certificate(cred_path)
                 firebase_admin.initialize_app(cred)
                 _initialized = True
-                print(f"✅ Firebase Admin inicializado con: {cred_path}")
+                log.info("Firebase Admin inicializado con: %s", cred_path)
             else:
-                print(f"⚠️ Archivo de credenciales no encontrado: {cred_path}")
-                print("   Las notificaciones push no funcionarán sin este archivo")
+                log.warning(
+                    "Archivo de credenciales no encontrado: %s. "
+                    "Las notificaciones push no funcionarán sin este archivo", cred_path
+                )
                 # Intentar usar variable de entorno (para producción)
                 if os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
                     firebase_admin.initialize_app()
                     _initialized = True
-                    print("✅ Firebase Admin inicializado desde variable de entorno")
+                    log.info("Firebase Admin inicializado desde variable de entorno")
                 else:
                     _initialized = False
         except Exception as e:
-            print(f"❌ Error inicializando Firebase Admin: {e}")
+            log.exception("Error inicializando Firebase Admin: %s", e)
             _initialized = False
 
 def send_notification(
@@ -47,7 +69,7 @@ def send_notification(
     
     if not _initialized or not fcm_token:
         if not _initialized:
-            print("⚠️ Firebase Admin no está inicializado")
+            log.warning("Firebase Admin no está inicializado")
         return False
     
     try:
@@ -58,73 +80,63 @@ def send_notification(
             ),
             data=data or {},
             token=fcm_token,
-            apns=messaging.APNSConfig(
-                payload=messaging.APNSPayload(
-                    aps=messaging.Aps(
-                        badge=1,
-                        sound="default",
-                    ),
-                ),
-            ),
-            android=messaging.AndroidConfig(
-                priority="high",
-                notification=messaging.AndroidNotification(
-                    sound="default",
-                    channel_id="high_importance_channel",
-                ),
-            ),
+            apns=_APNS_CONFIG,
+            android=_ANDROID_CONFIG,
         )
         
         response = messaging.send(message)
-        print(f"✅ Notificación enviada: {response}")
+        # Camino feliz: debug para no formatear nada con el nivel INFO de producción
+        log.debug("Notificación enviada: %s", response)
         return True
     except Exception as e:
-        print(f"❌ Error enviando notificación: {e}")
+        log.exception("Error enviando notificación: %s", e)
         return False
 
-def send_notification_to_multiple(
+# Límite de tokens por MulticastMessage impuesto por FCM
+FCM_MULTICAST_LIMIT = 500
+
+
+async def send_notification_to_multiple(
     fcm_tokens: list[str],
     title: str,
     body: str,
     data: Optional[dict] = None
 ) -> dict:
-    """Enviar notificación a múltiples dispositivos"""
+    """Enviar notificación a múltiples dispositivos (en lotes de 500, en paralelo)"""
     initialize_firebase_admin()
     
     if not _initialized or not fcm_tokens:
         return {"success": 0, "failure": len(fcm_tokens) if fcm_tokens else 0}
     
-    try:
-        message = messaging.MulticastMessage(
+    def build_message(tokens: list[str]) -> messaging.MulticastMessage:
+        return messaging.MulticastMessage(
             notification=messaging.Notification(
                 title=title,
                 body=body,
             ),
             data=data or {},
-            tokens=fcm_tokens,
-            apns=messaging.APNSConfig(
-                payload=messaging.APNSPayload(
-                    aps=messaging.Aps(
-                        badge=1,
-                        sound="default",
-                    ),
-                ),
-            ),
-            android=messaging.AndroidConfig(
-                priority="high",
-                notification=messaging.AndroidNotification(
-                    sound="default",
-                    channel_id="high_importance_channel",
-                ),
-            ),
+            tokens=tokens,
+            apns=_APNS_CONFIG,
+            android=_ANDROID_CONFIG,
         )
-        
-        response = messaging.send_multicast(message)
-        return {
-            "success": response.success_count,
-            "failure": response.failure_count,
-        }
-    except Exception as e:
-        print(f"❌ Error enviando notificaciones múltiples: {e}")
-        return {"success": 0, "failure": len(fcm_tokens)}
-
+    
+    chunks = [
+        fcm_tokens[i:i + FCM_MULTICAST_LIMIT]
+        for i in range(0, len(fcm_tokens), FCM_MULTICAST_LIMIT)
+    ]
+    # El SDK es bloqueante: cada lote va a un hilo para no bloquear el event loop
+    results = await asyncio.gather(
+        *(asyncio.to_thread(messaging.send_each_for_multicast, build_message(chunk)) for chunk in chunks),
+        return_exceptions=True,
+    )
+    
+    success = failure = 0
+    for chunk, result in zip(chunks, results):
+        if isinstance(result, BaseException):
+            log.error("Error enviando notificaciones múltiples: %s", result, exc_info=result)
+            failure += len(chunk)
+        else:
+            success += result.success_count
+            failure += result.failure_count
+    
+    return {"success": success, "failure": failure}
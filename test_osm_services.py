@@ -6,15 +6,15 @@ Run after starting the backend to verify everything works.
 Usage:
     python test_osm_services.py
 """
-import requests
-import json
+import asyncio
+import httpx
 
 BASE_URL = "http://localhost:8000"
 
-def test_poi_search():
+async def check_poi_search(client: httpx.AsyncClient, out: list):
     """Test POI search (Overpass)"""
-    print("Testing POI search...")
-    url = f"{BASE_URL}/osm/pois/search"
+    out.append("Testing POI search...")
+    url = "/osm/pois/search"
     payload = {
         "around": "40.4168,-3.7038,1000",
         "tags": {"amenity": "restaurant"},
@@ -22,44 +22,44 @@ def test_poi_search():
     }
     
     try:
-        resp = requests.post(url, json=payload, timeout=30)
+        resp = await client.post(url, json=payload)
         resp.raise_for_status()
         data = resp.json()
-        print(f"✓ Found {len(data)} POIs")
+        out.append(f"✓ Found {len(data)} POIs")
         if data:
-            print(f"  Example: {data[0].get('name', 'Unnamed')} at ({data[0]['lat']}, {data[0]['lon']})")
+            out.append(f"  Example: {data[0].get('name', 'Unnamed')} at ({data[0]['lat']}, {data[0]['lon']})")
         return True
     except Exception as e:
-        print(f"✗ Error: {e}")
+        out.append(f"✗ Error: {e}")
         return False
 
 
-def test_route_calculate():
+async def check_route_calculate(client: httpx.AsyncClient, out: list):
     """Test route calculation (OSRM)"""
-    print("\nTesting route calculation...")
-    url = f"{BASE_URL}/osm/route/calculate"
+    out.append("\nTesting route calculation...")
+    url = "/osm/route/calculate"
     payload = {
         "points": [[40.4168, -3.7038], [40.4165, -3.7026]],
         "profile": "driving"
     }
     
     try:
-        resp = requests.post(url, json=payload, timeout=30)
+        resp = await client.post(url, json=payload)
         resp.raise_for_status()
         data = resp.json()
         distance = data['distance']
         duration = data['duration']
-        print(f"✓ Route calculated: {distance:.0f}m in {duration:.0f}s")
+        out.append(f"✓ Route calculated: {distance:.0f}m in {duration:.0f}s")
         return True
     except Exception as e:
-        print(f"✗ Error: {e}")
+        out.append(f"✗ Error: {e}")
         return False
 
 
-def test_route_optimize():
+async def check_route_optimize(client: httpx.AsyncClient, out: list):
     """Test route optimization (OSRM /trip)"""
-    print("\nTesting route optimization...")
-    url = f"{BASE_URL}/osm/route/optimize"
+    out.append("\nTesting route optimization...")
+    url = "/osm/route/optimize"
     payload = {
         "points": [
             [40.4168, -3.7038],
@@ -71,78 +71,99 @@ def test_route_optimize():
     }
     
     try:
-        resp = requests.post(url, json=payload, timeout=30)
+        resp = await client.post(url, json=payload)
         resp.raise_for_status()
         data = resp.json()
         distance = data['distance']
         duration = data['duration']
         waypoints = data.get('waypoints', [])
         order = [wp.get('waypoint_index') for wp in waypoints]
-        print(f"✓ Route optimized: {distance:.0f}m in {duration:.0f}s")
-        print(f"  Visit order: {order}")
+        out.append(f"✓ Route optimized: {distance:.0f}m in {duration:.0f}s")
+        out.append(f"  Visit order: {order}")
         return True
     except Exception as e:
-        print(f"✗ Error: {e}")
+        out.append(f"✗ Error: {e}")
         return False
 
 
-def test_geocode_forward():
+async def check_geocode_forward(client: httpx.AsyncClient, out: list):
     """Test forward geocoding (Nominatim)"""
-    print("\nTesting forward geocoding...")
-    url = f"{BASE_URL}/osm/geocode/forward"
+    out.append("\nTesting forward geocoding...")
+    url = "/osm/geocode/forward"
     payload = {
         "query": "Plaza Mayor, Madrid",
         "limit": 3
     }
     
     try:
-        resp = requests.post(url, json=payload, timeout=30)
+        resp = await client.post(url, json=payload)
         resp.raise_for_status()
         data = resp.json()
-        print(f"✓ Found {len(data)} results")
+        out.append(f"✓ Found {len(data)} results")
         if data:
-            print(f"  {data[0]['display_name']}")
-            print(f"  Coords: ({data[0]['lat']}, {data[0]['lon']})")
+            out.append(f"  {data[0]['display_name']}")
+            out.append(f"  Coords: ({data[0]['lat']}, {data[0]['lon']})")
         return True
     except Exception as e:
-        print(f"✗ Error: {e}")
+        out.append(f"✗ Error: {e}")
         return False
 
 
-def test_geocode_reverse():
+async def check_geocode_reverse(client: httpx.AsyncClient, out: list):
     """Test reverse geocoding (Nominatim)"""
-    print("\nTesting reverse geocoding...")
-    url = f"{BASE_URL}/osm/geocode/reverse"
+    out.append("\nTesting reverse geocoding...")
+    url = "/osm/geocode/reverse"
     payload = {
         "lat": 40.4168,
         "lon": -3.7038
     }
     
     try:
-        resp = requests.post(url, json=payload, timeout=30)
+        resp = await client.post(url, json=payload)
         resp.raise_for_status()
         data = resp.json()
-        print(f"✓ Address found:")
-        print(f"  {data['display_name']}")
+        out.append(f"✓ Address found:")
+        out.append(f"  {data['display_name']}")
         return True
     except Exception as e:
-        print(f"✗ Error: {e}")
+        out.append(f"✗ Error: {e}")
         return False
 
 
-def main():
+async def main():
     print("=" * 60)
     print("OSM Services Test Suite")
     print("=" * 60)
     print(f"Backend URL: {BASE_URL}")
     print()
     
-    results = []
-    results.append(("POI Search", test_poi_search()))
-    results.append(("Route Calculate", test_route_calculate()))
-    results.append(("Route Optimize", test_route_optimize()))
-    results.append(("Forward Geocode", test_geocode_forward()))
-    results.append(("Reverse Geocode", test_geocode_reverse()))
+    # Overpass/OSRM checks are independent and run concurrently; Nominatim allows
+    # ~1 req/s, so the geocoding checks run one after another
+    concurrent_checks = [
+        ("POI Search", check_poi_search),
+        ("Route Calculate", check_route_calculate),
+        ("Route Optimize", check_route_optimize),
+    ]
+    sequential_checks = [
+        ("Forward Geocode", check_geocode_forward),
+        ("Reverse Geocode", check_geocode_reverse),
+    ]
+    # Each check buffers its own output so reports print in order, not interleaved
+    outputs = {name: [] for name, _ in concurrent_checks + sequential_checks}
+    
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=30) as client:
+        outcomes = list(await asyncio.gather(
+            *(fn(client, outputs[name]) for name, fn in concurrent_checks)
+        ))
+        for name, fn in sequential_checks:
+            outcomes.append(await fn(client, outputs[name]))
+    results = [
+        (name, passed)
+        for (name, _), passed in zip(concurrent_checks + sequential_checks, outcomes)
+    ]
+    
+    for name, _ in results:
+        print("\n".join(outputs[name]))
     
     print("\n" + "=" * 60)
     print("Summary:")
@@ -152,10 +173,10 @@ def main():
         print(f"{status:8} {name}")
     
     total = len(results)
-    passed = sum(1 for _, p in results if p)
+    passed = sum(outcomes)
     print(f"\nTotal: {passed}/{total} tests passed")
     
-    if passed == total:
+    if all(outcomes):
         print("\n✓ All tests passed!")
         return 0
     else:
@@ -164,4 +185,4 @@ def main():
 
 
 if __name__ == "__main__":
-    exit(main())
+    exit(asyncio.run(main()))
@@ -2,8 +2,103 @@
 Geocoding helper utilities for auto-resolving place names to coordinates
 and vice-versa using the internal OSM services.
 """
+import asyncio
 import httpx
-from typing import Optional, Tuple
+import numpy as np
+import orjson
+import os
+import time
+from collections import OrderedDict
+from math import radians, cos, sin, asin, sqrt
+from typing import List, Optional, Sequence, Tuple
+
+from utils.places import build_place_query  # re-exported for existing imports
+
+try:
+    # Optional: compiles the haversine kernels to native code when numba is installed
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+# Shared client: keeps TCP/TLS connections to Nominatim alive between geocodes
+_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+async def _get_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, creating it on first use."""
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+            headers={"User-Agent": "PlanificateApp/1.0"},
+            http2=True,
+        )
+    return _CLIENT
+
+
+async def close_http_client() -> None:
+    """Close the shared AsyncClient (called on application shutdown)."""
+    global _CLIENT
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+
+
+# LRU + TTL cache for geocoding results (Nominatim is rate-limited to ~1 req/s).
+# Only successful lookups are stored, so transient failures are retried.
+GEOCODE_CACHE_MAXSIZE = 4096
+GEOCODE_CACHE_TTL = 24 * 60 * 60  # seconds
+_geocode_cache: "OrderedDict[tuple, tuple[float, object]]" = OrderedDict()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _cache_get(key: tuple):
+    entry = _geocode_cache.get(key)
+    if entry is not None:
+        expires_at, value = entry
+        if time.monotonic() < expires_at:
+            _geocode_cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            return value
+        del _geocode_cache[key]
+    _cache_stats["misses"] += 1
+    return None
+
+
+def _cache_set(key: tuple, value) -> None:
+    _geocode_cache[key] = (time.monotonic() + GEOCODE_CACHE_TTL, value)
+    _geocode_cache.move_to_end(key)
+    if len(_geocode_cache) > GEOCODE_CACHE_MAXSIZE:
+        _geocode_cache.popitem(last=False)
+
+
+# Public Nominatim usage policy: at most 1 request per second per application.
+# Raise NOMINATIM_RATE (requests/second) for a self-hosted instance.
+NOMINATIM_RATE = float(os.getenv("NOMINATIM_RATE", "1"))
+_rate_lock: Optional[asyncio.Lock] = None
+_rate_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+_last_nominatim_request = 0.0
+
+
+async def throttle_nominatim() -> None:
+    """
+    Wait until at least 1/NOMINATIM_RATE seconds have passed since the previous
+    Nominatim request. Every Nominatim call path awaits this right before sending.
+    """
+    global _rate_lock, _rate_lock_loop, _last_nominatim_request
+    # Created lazily (and per event loop) so it never binds to a loop that is gone
+    loop = asyncio.get_running_loop()
+    if _rate_lock is None or _rate_lock_loop is not loop:
+        _rate_lock = asyncio.Lock()
+        _rate_lock_loop = loop
+    async with _rate_lock:
+        wait = _last_nominatim_request + 1.0 / NOMINATIM_RATE - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        _last_nominatim_request = time.monotonic()
 
 
 async def geocode_place_to_coords(
@@ -16,33 +111,43 @@ async def geocode_place_to_coords(
     Returns:
         (lat, lon, display_name) or None if geocoding fails
     """
+    cache_key = ("search", place_query.strip().lower())
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            resp = await client.get(
-                "https://nominatim.openstreetmap.org/search",
-                params={
-                    "q": place_query,
-                    "format": "json",
-                    "limit": 1,
-                    "addressdetails": 1
-                },
-                headers={"User-Agent": "PlanificateApp/1.0"}
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            
-            if data:
-                result = data[0]
-                lat = float(result["lat"])
-                lon = float(result["lon"])
-                display_name = result["display_name"]
-                return (lat, lon, display_name)
+        client = await _get_client()
+        await throttle_nominatim()
+        resp = await client.get(
+            "https://nominatim.openstreetmap.org/search",
+            params={
+                "q": place_query,
+                "format": "json",
+                "limit": 1
+            },
+            timeout=timeout
+        )
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+        
+        if data:
+            result = data[0]
+            lat = float(result["lat"])
+            lon = float(result["lon"])
+            display_name = result["display_name"]
+            _cache_set(cache_key, (lat, lon, display_name))
+            return (lat, lon, display_name)
     except Exception:
         pass
     
     return None
 
 
+# Nominatim address keys that can hold the locality name, in order of preference
+_CITY_KEYS = ("city", "town", "village", "municipality")
+
+
 async def reverse_geocode_coords(
     lat: float,
     lon: float,
@@ -54,55 +159,65 @@ async def reverse_geocode_coords(
     Returns:
         Dict with keys: display_name, city, country, address or None
     """
+    # 5 decimals ≈ 1.1 m: nearby requests for the same spot share an entry
+    cache_key = ("reverse", round(lat, 5), round(lon, 5))
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return dict(cached)
+    
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            resp = await client.get(
-                "https://nominatim.openstreetmap.org/reverse",
-                params={
-                    "lat": lat,
-                    "lon": lon,
-                    "format": "json",
-                    "addressdetails": 1
-                },
-                headers={"User-Agent": "PlanificateApp/1.0"}
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            
-            if "error" not in data:
-                address_parts = data.get("address", {})
-                return {
-                    "display_name": data.get("display_name", ""),
-                    "city": (
-                        address_parts.get("city") or
-                        address_parts.get("town") or
-                        address_parts.get("village") or
-                        address_parts.get("municipality") or
-                        ""
-                    ),
-                    "country": address_parts.get("country", ""),
-                    "address": data.get("display_name", "")
-                }
+        client = await _get_client()
+        await throttle_nominatim()
+        resp = await client.get(
+            "https://nominatim.openstreetmap.org/reverse",
+            params={
+                "lat": lat,
+                "lon": lon,
+                "format": "json",
+                "addressdetails": 1
+            },
+            timeout=timeout
+        )
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+        
+        if "error" not in data:
+            address_parts = data.get("address", {})
+            result = {
+                "display_name": data.get("display_name", ""),
+                "city": next((address_parts[k] for k in _CITY_KEYS if address_parts.get(k)), ""),
+                "country": address_parts.get("country", ""),
+                "address": data.get("display_name", "")
+            }
+            _cache_set(cache_key, result)
+            return dict(result)
     except Exception:
         pass
     
     return None
 
 
-def build_place_query(city: Optional[str] = None, country: Optional[str] = None, address: Optional[str] = None) -> Optional[str]:
-    """Build a place query string from city, country, address fields."""
-    parts = []
-    if address:
-        parts.append(address)
-    if city:
-        parts.append(city)
-    if country:
-        parts.append(country)
+async def reverse_geocode_many(
+    pairs: Sequence[Tuple[float, float]],
+    timeout: float = 10.0
+) -> List[Optional[dict]]:
+    """
+    Reverse geocode several (lat, lon) pairs concurrently.
+    
+    Duplicate points (same cache key) are looked up once; cache misses are
+    spaced out by throttle_nominatim() to respect NOMINATIM_RATE.
     
-    return ", ".join(parts) if parts else None
+    Returns:
+        One reverse_geocode_coords result (or None) per input pair, in order
+    """
+    keys = [(round(lat, 5), round(lon, 5)) for lat, lon in pairs]
+    unique = list(dict.fromkeys(keys))
+    results = await asyncio.gather(*(reverse_geocode_coords(lat, lon, timeout=timeout) for lat, lon in unique))
+    by_key = dict(zip(unique, results))
+    return [dict(by_key[k]) if by_key[k] is not None else None for k in keys]
 
 
-def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+def _haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calculate the great circle distance between two points on the Earth
     (specified in decimal degrees) using the Haversine formula.
@@ -110,10 +225,11 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     Returns:
         Distance in meters
     """
-    from math import radians, cos, sin, asin, sqrt
-    
     # Convert decimal degrees to radians
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    lat1 = radians(lat1)
+    lon1 = radians(lon1)
+    lat2 = radians(lat2)
+    lon2 = radians(lon2)
     
     # Haversine formula
     dlat = lat2 - lat1
@@ -125,3 +241,31 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     r = 6371000
     
     return c * r
+
+
+if HAS_NUMBA:
+    haversine_distance = njit(cache=True, fastmath=True, boundscheck=False)(_haversine_distance)
+    # Warm-up at import so the first request does not pay the JIT compile (cached to disk)
+    haversine_distance(0.0, 0.0, 0.0, 0.0)
+else:
+    haversine_distance = _haversine_distance
+
+
+def haversine_matrix(lats: Sequence[float], lons: Sequence[float]) -> np.ndarray:
+    """
+    Pairwise great circle distances between N points (decimal degrees),
+    computed with NumPy broadcasting instead of N² scalar calls.
+    
+    Returns:
+        (N, N) array of distances in meters
+    """
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    cos_lat = np.cos(lat)
+    a = np.sin(dlat / 2) ** 2 + cos_lat[:, None] * cos_lat[None, :] * np.sin(dlon / 2) ** 2
+    
+    # Same earth radius as haversine_distance; clip guards sqrt against rounding above 1
+    return 2 * 6371000 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
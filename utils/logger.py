@@ -1,13 +1,21 @@
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Background thread that owns the file handler; callers only enqueue records
+_listener: QueueListener | None = None
 
 
 def setup_api_logger(log_path: str | None = None) -> logging.Logger:
     """Setup and return an application-wide logger for API errors.
 
-    Creates a rotating file handler at `log_path` (defaults to ./logs/api.log).
+    Records are pushed onto an in-memory queue and written by a background
+    `QueueListener` to a rotating file at `log_path` (defaults to ./logs/api.log).
     """
+    global _listener
+
     if log_path is None:
         base = os.path.abspath(os.path.dirname(__file__))
         logs_dir = os.path.join(base, '..', 'logs')
@@ -22,6 +30,25 @@ def setup_api_logger(log_path: str | None = None) -> logging.Logger:
         handler = RotatingFileHandler(log_path, maxBytes=5 * 1024 * 1024, backupCount=5, encoding='utf-8')
         formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(name)s: %(message)s')
         handler.setFormatter(formatter)
-        logger.addHandler(handler)
+
+        log_queue: queue.Queue = queue.Queue(-1)
+        logger.addHandler(QueueHandler(log_queue))
+        _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        # Runs for the whole process (an app lifespan may start/stop several times);
+        # flushed and stopped only at interpreter exit
+        atexit.register(stop_api_logger)
 
     return logger
+
+
+def stop_api_logger() -> None:
+    """Flush queued records and stop the background writer thread (registered with atexit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# Configured once at import: callers use this object directly
+api_log = setup_api_logger()
@@ -0,0 +1,18 @@
+"""
+Place-name helpers with no I/O or heavy dependencies, shared by the schemas
+and the geocoding helpers.
+"""
+from typing import Optional
+
+
+def build_place_query(city: Optional[str] = None, country: Optional[str] = None, address: Optional[str] = None) -> Optional[str]:
+    """Build a place query string from city, country, address fields."""
+    parts = []
+    if address:
+        parts.append(address)
+    if city:
+        parts.append(city)
+    if country:
+        parts.append(country)
+    
+    return ", ".join(parts) if parts else None